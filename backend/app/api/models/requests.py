@@ -1,5 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional
+
+from app.services.workspaces import validate_workspace_id
+
+WorkspaceId = Annotated[str, AfterValidator(validate_workspace_id)]
+
+Question = Annotated[str, Field(min_length=1)]
 
 
 class ChatRequest(BaseModel):
@@ -7,12 +13,32 @@ class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1, description="User's question")
     conversation_id: Optional[str] = Field(None, description="Conversation ID for context")
     document_ids: Optional[list[str]] = Field(None, description="Specific documents to query")
+    workspace_ids: Optional[list[WorkspaceId]] = Field(None, description="Workspace shards to search")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "question": "What are the main topics discussed in the document?",
                 "conversation_id": "conv_123",
+                "document_ids": ["doc_abc", "doc_xyz"],
+                "workspace_ids": ["team_a"]
+            }
+        }
+
+
+class BatchChatRequest(BaseModel):
+    """Request model for the batch question answering endpoint."""
+    questions: list[Question] = Field(..., min_length=1, max_length=1000, description="Independent questions to answer")
+    document_ids: Optional[list[str]] = Field(None, description="Specific documents to query")
+    workspace_ids: Optional[list[WorkspaceId]] = Field(None, description="Workspace shards to search")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What is the refund policy?",
+                    "Who approves budget changes?"
+                ],
                 "document_ids": ["doc_abc", "doc_xyz"]
             }
         }
@@ -42,6 +42,16 @@ class ChatResponse(BaseModel):
         }
 
 
+class BatchChatResult(BaseModel):
+    """One line of the NDJSON batch chat response."""
+    index: int = Field(..., description="Position of the question in the request")
+    question: str = Field(..., description="The question answered")
+    answer: Optional[str] = Field(None, description="Generated answer, if successful")
+    sources: list[SourceDocument] = Field(default_factory=list, description="Source citations")
+    message_id: Optional[str] = Field(None, description="Unique message ID")
+    error: Optional[str] = Field(None, description="Error message, if this question failed")
+
+
 class UploadResponse(BaseModel):
     """Response for file upload."""
     document_id: str = Field(..., description="Unique document ID")
@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from functools import lru_cache
+from typing import AsyncIterator
 import logging
 
-from app.api.models.requests import ChatRequest
-from app.api.models.responses import ChatResponse
+from app.api.models.requests import ChatRequest, BatchChatRequest
+from app.api.models.responses import ChatResponse, BatchChatResult
+from app.services.admission import (
+    AdmissionError,
+    QueueFullError,
+    DeadlineExceededError
+)
 from app.services.rag_service import RAGService
+from app.services.vector_store import ShardNotFoundError
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize RAG service
-rag_service = RAGService()
+
+@lru_cache()
+def get_rag_service() -> RAGService:
+    """Shared RAG service, created on first use (overridable in tests)."""
+    return RAGService()
 
 
 @router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(
+    request: ChatRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+) -> ChatResponse:
     """
     Chat endpoint for asking questions about uploaded documents.
 
@@ -27,11 +42,32 @@ async def chat(request: ChatRequest) -> ChatResponse:
         result = await rag_service.ask_question(
             question=request.question,
             conversation_id=request.conversation_id,
-            document_ids=request.document_ids
+            document_ids=request.document_ids,
+            workspace_ids=request.workspace_ids
         )
 
         return ChatResponse(**result)
 
+    except ShardNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    except AdmissionError as e:
+        logger.warning(f"Chat request not served: {e}")
+        if isinstance(e, QueueFullError):
+            status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        elif isinstance(e, DeadlineExceededError):
+            status_code = status.HTTP_504_GATEWAY_TIMEOUT
+        else:
+            status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        raise HTTPException(
+            status_code=status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(
@@ -40,8 +76,63 @@ async def chat(request: ChatRequest) -> ChatResponse:
         )
 
 
+@router.post("/batch")
+async def chat_batch(
+    request: BatchChatRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+) -> StreamingResponse:
+    """
+    Answer many independent questions against the same documents.
+
+    This endpoint:
+    1. Embeds all questions in one pass
+    2. Retrieves chunks for every question together
+    3. Answers the questions with bounded concurrency against the LLM
+    4. Streams one NDJSON line per question as each answer completes
+
+    A failed question is reported on its own line with an `error` field;
+    the other questions are unaffected.
+    """
+    try:
+        results = await rag_service.answer_batch(
+            questions=request.questions,
+            document_ids=request.document_ids,
+            workspace_ids=request.workspace_ids
+        )
+    except ShardNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error in batch chat endpoint: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving context: {str(e)}"
+        )
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            async for result in results:
+                yield BatchChatResult(**result).model_dump_json() + "\n"
+        finally:
+            # Stops outstanding answers if the client disconnects
+            await results.aclose()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/metrics")
+async def chat_metrics(rag_service: RAGService = Depends(get_rag_service)):
+    """LLM admission control metrics, including queue-wait percentiles."""
+    return rag_service.admission.stats()
+
+
 @router.delete("/conversation/{conversation_id}")
-async def clear_conversation(conversation_id: str):
+async def clear_conversation(
+    conversation_id: str,
+    rag_service: RAGService = Depends(get_rag_service)
+):
     """Clear conversation history."""
     try:
         rag_service.clear_conversation(conversation_id)
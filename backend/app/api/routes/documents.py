@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 import logging
-from typing import List
+from typing import List, Optional
 
+from app.api.models.requests import WorkspaceId
 from app.api.models.responses import DocumentInfo
 
 logger = logging.getLogger(__name__)
@@ -22,21 +23,30 @@ async def get_documents() -> List[DocumentInfo]:
 
 
 @router.delete("/{document_id}")
-async def delete_document(document_id: str):
+async def delete_document(
+    document_id: str,
+    workspace_id: Optional[WorkspaceId] = Query(None)
+):
     """
     Delete a document and all its associated chunks.
 
     Note: This is a placeholder implementation.
     In a production system, you would also delete from the database.
     """
-    try:
-        from app.services.vector_store import VectorStoreService
+    from app.services.vector_store import VectorStoreService, ShardNotFoundError
 
-        vector_service = VectorStoreService()
+    try:
+        vector_service = VectorStoreService(workspace_id, create=False)
         vector_service.delete_by_document_id(document_id)
 
         return {"message": f"Document {document_id} deleted successfully"}
 
+    except ShardNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
     except Exception as e:
         logger.error(f"Error deleting document: {e}")
         raise HTTPException(
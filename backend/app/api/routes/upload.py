@@ -1,11 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
 from pathlib import Path
 import aiofiles
 import uuid
 import logging
-from typing import List
+from typing import List, Optional
 
 from app.config import get_settings
+from app.api.models.requests import WorkspaceId
 from app.api.models.responses import UploadResponse
 from app.services.document_processor import DocumentProcessor
 from app.services.vector_store import VectorStoreService
@@ -21,7 +22,8 @@ vector_service = VectorStoreService()
 
 @router.post("/", response_model=UploadResponse)
 async def upload_file(
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    workspace_id: Optional[WorkspaceId] = Form(None)
 ) -> UploadResponse:
     """
     Upload and process a single document.
@@ -30,7 +32,7 @@ async def upload_file(
     1. Validates the file type and size
     2. Saves the file temporarily
     3. Loads and chunks the document
-    4. Generates embeddings and stores in vector DB
+    4. Generates embeddings and stores in the workspace's vector DB shard
     5. Returns document metadata
     """
     # Validate file extension
@@ -75,8 +77,11 @@ async def upload_file(
             file.filename
         )
 
-        # Add to vector store
-        vector_service.add_documents(chunks, document_id)
+        # Add to the workspace shard (or the shared collection)
+        if workspace_id:
+            VectorStoreService(workspace_id).add_documents(chunks, document_id)
+        else:
+            vector_service.add_documents(chunks, document_id)
 
         return UploadResponse(
             document_id=document_id,
@@ -100,7 +105,8 @@ async def upload_file(
 
 @router.post("/batch", response_model=List[UploadResponse])
 async def upload_multiple_files(
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    workspace_id: Optional[WorkspaceId] = Form(None)
 ) -> List[UploadResponse]:
     """
     Upload and process multiple documents.
@@ -109,7 +115,7 @@ async def upload_multiple_files(
 
     for file in files:
         try:
-            response = await upload_file(file)
+            response = await upload_file(file, workspace_id)
             responses.append(response)
         except HTTPException as e:
             # Continue processing other files even if one fails
@@ -22,9 +22,16 @@ class Settings(BaseSettings):
     # Vector Store
     chroma_persist_dir: str = "app/storage/chroma_db"
     collection_name: str = "documents"
+    shard_search_workers: int = 8  # Parallel shard searches per process
 
     # Embeddings
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = "local"  # or "sidecar"
+    embedding_socket_path: str = "/tmp/knowledge_assist_embeddings.sock"
+    embedding_sidecar_timeout: float = 30.0  # seconds
+    embedding_batch_size: int = 256  # Max texts per sidecar model call
+    embedding_batch_wait_ms: float = 5.0  # Window to coalesce worker requests
+    embedding_max_request_bytes: int = 16 * 1024 * 1024  # 16MB per sidecar request
 
     # LLM Configuration
     llm_provider: str = "anthropic"  # or "openai"
@@ -34,10 +41,35 @@ class Settings(BaseSettings):
     llm_temperature: float = 0.0
     max_tokens: int = 2000
 
+    # Fallback LLM (empty provider disables hedging and failover)
+    llm_fallback_provider: str = ""  # "anthropic" or "openai"
+    llm_fallback_model: str = ""  # Required for a different provider; else defaults to llm_model
+    llm_hedge_delay: float = 2.0  # Seconds without a first token before hedging; 0 = failover only
+
+    # LLM Admission Control
+    llm_max_concurrency: int = 8  # Concurrent LLM calls per process
+    llm_max_queue_depth: int = 32  # Requests allowed to wait for a slot
+    llm_queue_timeout: float = 10.0  # Max seconds to wait for a slot
+    llm_request_timeout: float = 60.0  # Deadline per chat request, queue wait included
+
     # RAG Configuration
     chunk_size: int = 1000
     chunk_overlap: int = 200
     retrieval_k: int = 4  # Number of chunks to retrieve
+    batch_max_concurrency: int = 4  # Concurrent LLM calls per batch request
+
+    # Reranking
+    reranker_enabled: bool = False
+    reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_candidates: int = 20  # First-stage chunks fetched for reranking
+    rerank_batch_size: int = 32
+    rerank_skip_gap: float = 0.15  # First-stage distance gap that skips reranking
+    rerank_cache_size: int = 10000  # Cached (query, chunk) scores
+
+    # Bulk Ingestion
+    ingest_workers: int = 0  # Parser processes; 0 uses all CPU cores
+    ingest_batch_size: int = 512  # Chunks per embed/write batch
+    ingest_manifest_dir: str = "app/storage/ingest_manifests"
 
     class Config:
         env_file = ".env"
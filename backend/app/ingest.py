@@ -0,0 +1,315 @@
+"""
+Bulk ingestion of a local document directory.
+
+Walks a directory, parses and chunks files in a process pool, embeds and
+writes the chunks to the vector store in large batches, and records every
+finished file in a manifest so an interrupted run resumes where it stopped.
+
+Usage:
+
+    python -m app.ingest /path/to/archive [--workspace-id team_a]
+"""
+from concurrent.futures import ProcessPoolExecutor, Future
+from pathlib import Path
+from typing import Iterator, Optional
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+from app.config import get_settings
+from app.services.document_processor import DocumentProcessor
+from app.services.workspaces import validate_workspace_id
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# One processor per pool worker, created lazily
+_worker_processor: Optional[DocumentProcessor] = None
+
+
+def _parse_file(file_path: str) -> list:
+    """Load and chunk one file inside a pool worker."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = DocumentProcessor()
+    return _worker_processor.process_file(file_path, Path(file_path).name)
+
+
+def document_id_for(root: Path, relative_path: str) -> str:
+    """
+    Stable document ID for a file, so re-runs overwrite instead of duplicate.
+
+    The resolved root is part of the hash so that two archives with a file
+    at the same relative path don't collide in one collection. The full
+    digest is kept: a collision would make one file's re-ingest delete the
+    other's chunks.
+    """
+    key = f"{root.resolve().as_posix()}|{relative_path}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f"doc_{digest}"
+
+
+class IngestManifest:
+    """Append-only JSONL record of files that have been ingested."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted run
+                        logger.warning(f"Skipping corrupt manifest line in {self.path}")
+                        continue
+                    self.entries[entry["path"]] = entry
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def is_done(self, relative_path: str, stat: os.stat_result) -> bool:
+        """Whether this exact file version was already processed."""
+        entry = self.entries.get(relative_path)
+        return (
+            entry is not None
+            and entry["status"] == "processed"
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime
+        )
+
+    def record(self, entries: list[dict]) -> None:
+        """Append entries and flush them to disk."""
+        for entry in entries:
+            self.entries[entry["path"]] = entry
+            self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class BulkIngester:
+    """Ingest a directory of documents into the vector store."""
+
+    def __init__(
+        self,
+        root: Path,
+        manifest: IngestManifest,
+        workspace_id: Optional[str] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        # Imported here so parser processes don't pull in the vector store stack
+        from app.services.vector_store import VectorStoreService
+
+        self.root = root
+        self.manifest = manifest
+        self.vector_service = VectorStoreService(workspace_id)
+        self.workers = workers or settings.ingest_workers or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.ingest_batch_size
+
+        self.files_done = 0
+        self.files_failed = 0
+        self.files_skipped = 0
+        self.chunks_written = 0
+        self._started = 0.0
+
+    def _discover(self) -> Iterator[tuple[Path, str, os.stat_result]]:
+        """Yield supported files that still need ingesting."""
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in settings.allowed_extensions:
+                continue
+
+            relative_path = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            if self.manifest.is_done(relative_path, stat):
+                self.files_skipped += 1
+                continue
+
+            yield path, relative_path, stat
+
+    def _report(self) -> None:
+        """Log progress and throughput so far."""
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        logger.info(
+            f"Ingested {self.files_done} files ({self.files_failed} failed, "
+            f"{self.files_skipped} skipped), {self.chunks_written} chunks | "
+            f"{self.files_done / elapsed:.1f} files/s, "
+            f"{self.chunks_written / elapsed:.1f} chunks/s"
+        )
+
+    def _flush(self, pending: list[tuple[str, os.stat_result, list]]) -> None:
+        """Embed and write a batch of parsed files, then checkpoint them."""
+        documents_by_id = {
+            document_id_for(self.root, relative_path): chunks
+            for relative_path, _, chunks in pending
+        }
+        try:
+            ids = self.vector_service.add_documents_bulk(
+                documents_by_id,
+                batch_size=self.batch_size
+            )
+        except Exception as e:
+            # Find the file(s) responsible instead of failing the whole run
+            logger.warning(f"Batch write of {len(pending)} files failed, retrying per file: {e}")
+            for item in pending:
+                self._flush_one(*item)
+            self._report()
+            return
+
+        self._record_processed(pending)
+        self.chunks_written += len(ids)
+        self._report()
+
+    def _flush_one(
+        self,
+        relative_path: str,
+        stat: os.stat_result,
+        chunks: list
+    ) -> None:
+        """Write a single parsed file, recording it as failed if that fails."""
+        try:
+            ids = self.vector_service.add_documents_bulk(
+                {document_id_for(self.root, relative_path): chunks},
+                batch_size=self.batch_size
+            )
+        except Exception as e:
+            self._record_failure(relative_path, stat, e)
+            return
+
+        self._record_processed([(relative_path, stat, chunks)])
+        self.chunks_written += len(ids)
+
+    def _record_processed(self, done: list[tuple[str, os.stat_result, list]]) -> None:
+        self.manifest.record([
+            {
+                "path": relative_path,
+                "document_id": document_id_for(self.root, relative_path),
+                "status": "processed",
+                "num_chunks": len(chunks),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime
+            }
+            for relative_path, stat, chunks in done
+        ])
+        self.files_done += len(done)
+
+    def _record_failure(
+        self,
+        relative_path: str,
+        stat: os.stat_result,
+        error: Exception
+    ) -> None:
+        logger.error(f"Failed to ingest {relative_path}: {error}")
+        self.files_failed += 1
+        self.manifest.record([{
+            "path": relative_path,
+            "document_id": document_id_for(self.root, relative_path),
+            "status": "failed",
+            "error": str(error),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime
+        }])
+
+    def run(self) -> None:
+        """Parse files in a process pool and write them in large batches."""
+        self._started = time.monotonic()
+        # Bound parsed-but-unwritten work to keep memory flat on huge archives
+        max_in_flight = self.workers * 4
+
+        pending: list[tuple[str, os.stat_result, list]] = []
+        pending_chunks = 0
+        in_flight: list[tuple[str, os.stat_result, Future]] = []
+
+        def collect(relative_path: str, stat: os.stat_result, future: Future) -> None:
+            nonlocal pending_chunks
+            try:
+                chunks = future.result()
+            except Exception as e:
+                self._record_failure(relative_path, stat, e)
+                return
+
+            pending.append((relative_path, stat, chunks))
+            pending_chunks += len(chunks)
+            if pending_chunks >= self.batch_size:
+                self._flush(pending)
+                pending.clear()
+                pending_chunks = 0
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for path, relative_path, stat in self._discover():
+                in_flight.append(
+                    (relative_path, stat, executor.submit(_parse_file, str(path)))
+                )
+                if len(in_flight) >= max_in_flight:
+                    collect(*in_flight.pop(0))
+
+            for item in in_flight:
+                collect(*item)
+
+        if pending:
+            self._flush(pending)
+
+        self._report()
+
+
+def _default_manifest_path(root: Path, workspace_id: Optional[str]) -> Path:
+    """One manifest per (directory, workspace) under the storage dir."""
+    key = hashlib.sha1(f"{root.resolve()}|{workspace_id or ''}".encode("utf-8")).hexdigest()
+    return Path(settings.ingest_manifest_dir) / f"{key[:16]}.jsonl"
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk-ingest a directory of documents into the vector store."
+    )
+    parser.add_argument("directory", type=Path, help="Directory to ingest")
+    parser.add_argument("--workspace-id", help="Workspace shard to ingest into")
+    parser.add_argument("--manifest", type=Path, help="Checkpoint manifest path")
+    parser.add_argument("--workers", type=int, help="Parser processes")
+    parser.add_argument("--batch-size", type=int, help="Chunks per embed/write batch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not args.directory.is_dir():
+        parser.error(f"{args.directory} is not a directory")
+
+    if args.workspace_id:
+        try:
+            validate_workspace_id(args.workspace_id)
+        except ValueError as e:
+            parser.error(f"Invalid workspace ID {args.workspace_id!r}: {e}")
+
+    manifest_path = args.manifest or _default_manifest_path(
+        args.directory, args.workspace_id
+    )
+    manifest = IngestManifest(manifest_path)
+    logger.info(f"Using manifest {manifest_path}")
+
+    try:
+        BulkIngester(
+            args.directory,
+            manifest,
+            workspace_id=args.workspace_id,
+            workers=args.workers,
+            batch_size=args.batch_size
+        ).run()
+    except KeyboardInterrupt:
+        logger.info("Interrupted; re-run the same command to resume")
+    finally:
+        manifest.close()
+
+
+if __name__ == "__main__":
+    main()
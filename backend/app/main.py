@@ -28,6 +28,14 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize vector store: {e}")
         raise
 
+    # Initialize RAG service so LLM misconfiguration fails at startup
+    try:
+        chat.get_rag_service()
+        logger.info("RAG service initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize RAG service: {e}")
+        raise
+
     yield
 
     # Shutdown
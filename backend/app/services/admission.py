@@ -0,0 +1,296 @@
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import BaseMessage
+from langchain.schema.output import ChatResult
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+import asyncio
+import logging
+import math
+import time
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class AdmissionError(Exception):
+    """Base error for requests rejected or abandoned by admission control."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionError):
+    """The wait queue is at capacity."""
+
+
+class QueueTimeoutError(AdmissionError):
+    """The request waited for a slot longer than allowed."""
+
+
+class DeadlineExceededError(AdmissionError):
+    """The request was admitted but did not finish before its deadline."""
+
+
+@dataclass
+class _RequestScope:
+    """Deadline and slot shared by every LLM call made for one request."""
+
+    controller: "AdmissionController"
+    deadline: float
+    admitted_at: Optional[float] = None
+
+
+_current_request: ContextVar[Optional[_RequestScope]] = ContextVar(
+    "admission_request",
+    default=None
+)
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded wait queue and per-request deadlines.
+
+    At most `max_concurrency` requests hold an LLM slot at once and at most
+    `max_queue_depth` wait for one; anything beyond that is rejected
+    immediately so latency under overload stays predictable. Inside a
+    `request()` scope, the first LLM call takes a slot and later calls reuse
+    it, so a multi-call chain queues once and shares one deadline.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        request_timeout: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.max_queue_depth = (
+            max_queue_depth if max_queue_depth is not None
+            else settings.llm_max_queue_depth
+        )
+        self.queue_timeout = queue_timeout or settings.llm_queue_timeout
+        self.request_timeout = request_timeout or settings.llm_request_timeout
+
+        # Created lazily so it binds to the serving event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._active = 0
+
+        self._queue_waits: deque[float] = deque(maxlen=1000)
+        self._service_times: deque[float] = deque(maxlen=100)
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.deadline_exceeded = 0
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up, from recent service times."""
+        if not self._service_times:
+            return 1
+        avg_service = sum(self._service_times) / len(self._service_times)
+        backlog = (self._waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(avg_service * backlog))
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        """
+        Scope one request: its LLM calls share a slot and a single deadline.
+
+        The deadline starts when the scope is entered. The slot is taken by
+        the first LLM call and held until the scope exits.
+        """
+        scope = _RequestScope(
+            controller=self,
+            deadline=time.monotonic() + self.request_timeout
+        )
+        token = _current_request.set(scope)
+        try:
+            yield
+        finally:
+            _current_request.reset(token)
+            if scope.admitted_at is not None:
+                self._release(scope.admitted_at)
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `call` once a slot is free, within the request deadline.
+
+        Inside a `request()` scope that already holds a slot, the call runs
+        straight away under the scope's remaining deadline.
+
+        Args:
+            call: Zero-argument factory returning the awaitable to run
+
+        Returns:
+            The awaitable's result
+
+        Raises:
+            QueueFullError: No slot and no room left in the queue
+            QueueTimeoutError: No slot became free in time
+            DeadlineExceededError: The request outlived its deadline
+        """
+        scope = _current_request.get()
+        if scope is not None and scope.controller is not self:
+            scope = None
+        if scope is not None and scope.admitted_at is not None:
+            return await self._call_before(call, scope.deadline)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        capacity = self.max_concurrency + self.max_queue_depth
+        if self._waiting + self._active >= capacity:
+            self.rejected_queue_full += 1
+            raise QueueFullError(
+                "Too many requests are waiting for the LLM",
+                retry_after=self._retry_after()
+            )
+
+        started = time.monotonic()
+        deadline = scope.deadline if scope is not None else started + self.request_timeout
+        if deadline <= started:
+            self.deadline_exceeded += 1
+            raise DeadlineExceededError(
+                f"Request exceeded its {self.request_timeout:.0f}s deadline",
+                retry_after=self._retry_after()
+            )
+        queue_timeout = min(self.queue_timeout, deadline - started)
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=queue_timeout)
+        except asyncio.TimeoutError:
+            # These waited longest, so leaving them out would hide overload
+            self._queue_waits.append(time.monotonic() - started)
+            self.rejected_queue_timeout += 1
+            raise QueueTimeoutError(
+                f"No LLM capacity became available within {queue_timeout:.0f}s",
+                retry_after=self._retry_after()
+            )
+        finally:
+            self._waiting -= 1
+
+        admitted_at = time.monotonic()
+        self._queue_waits.append(admitted_at - started)
+        self.admitted += 1
+        self._active += 1
+
+        if scope is not None:
+            # Held until the request scope exits
+            scope.admitted_at = admitted_at
+            return await self._call_before(call, deadline)
+
+        try:
+            return await self._call_before(call, deadline)
+        finally:
+            self._release(admitted_at)
+
+    async def _call_before(self, call: Callable[[], Awaitable[T]], deadline: float) -> T:
+        """Await `call`, abandoning it at `deadline`."""
+        try:
+            return await asyncio.wait_for(
+                call(),
+                timeout=max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise DeadlineExceededError(
+                f"Request exceeded its {self.request_timeout:.0f}s deadline",
+                retry_after=self._retry_after()
+            )
+
+    def _release(self, admitted_at: float) -> None:
+        """Give a slot back and record how long it was held."""
+        self._service_times.append(time.monotonic() - admitted_at)
+        self._active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Current load and queue-wait metrics."""
+        waits = sorted(self._queue_waits)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self._active,
+            "queued": self._waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_queue_timeout": self.rejected_queue_timeout,
+            "deadline_exceeded": self.deadline_exceeded,
+            "queue_wait_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": waits[-1] * 1000 if waits else 0.0
+            }
+        }
+
+
+class AdmittedChatModel(BaseChatModel):
+    """
+    Chat model wrapper that sends every async call through admission control.
+
+    Only the LLM calls take a slot; retrieval and embedding that run before
+    the first call in a request stay outside the gate. Run the chain inside
+    `AdmissionController.request()` so its calls share one slot and deadline.
+    """
+
+    llm: BaseChatModel
+    admission: AdmissionController
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        """Synchronous calls bypass the asyncio-based admission gate."""
+        return self.llm._generate(
+            messages,
+            stop=stop,
+            run_manager=run_manager,
+            **kwargs
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return await self.admission.run(
+            lambda: self.llm._agenerate(
+                messages,
+                stop=stop,
+                run_manager=run_manager,
+                **kwargs
+            )
+        )
@@ -0,0 +1,255 @@
+"""
+Shared embedding sidecar.
+
+One process owns the sentence-transformer model and serves batched embed
+requests over a Unix socket; API workers use the thin `SidecarEmbeddings`
+client instead of loading their own copy of the model.
+
+Run the sidecar with:
+
+    python -m app.services.embedding_sidecar
+"""
+from langchain.schema.embeddings import Embeddings
+from pathlib import Path
+from typing import Optional
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Every message is a 4-byte big-endian length followed by a JSON payload
+_HEADER = struct.Struct("!I")
+
+
+def _encode_message(payload: dict) -> bytes:
+    """Frame a JSON payload for the socket."""
+    body = json.dumps(payload).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly `size` bytes from a blocking socket."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Embedding sidecar closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """Whether a process is accepting connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+class SidecarEmbeddings(Embeddings):
+    """Embeddings client that forwards requests to the embedding sidecar."""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.socket_path = socket_path or settings.embedding_socket_path
+        self.timeout = timeout or settings.embedding_sidecar_timeout
+
+    def _request(self, texts: list[str]) -> list[list[float]]:
+        """Send one embed request and wait for the vectors."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(_encode_message({"texts": texts}))
+
+            (length,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+            response = json.loads(_recv_exactly(sock, length))
+
+        if "error" in response:
+            raise RuntimeError(f"Embedding sidecar error: {response['error']}")
+
+        return response["embeddings"]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed a list of documents via the sidecar."""
+        if not texts:
+            return []
+        return self._request(list(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a single query via the sidecar."""
+        return self._request([text])[0]
+
+
+class EmbeddingSidecar:
+    """Owns the embedding model and coalesces requests into batches."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        socket_path: Optional[str] = None,
+        max_batch_size: Optional[int] = None,
+        batch_wait_ms: Optional[float] = None
+    ):
+        self.embeddings = embeddings
+        self.socket_path = socket_path or settings.embedding_socket_path
+        self.max_batch_size = max_batch_size or settings.embedding_batch_size
+        self.max_request_bytes = settings.embedding_max_request_bytes
+        self.batch_wait = (
+            batch_wait_ms if batch_wait_ms is not None
+            else settings.embedding_batch_wait_ms
+        ) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+
+    async def _batch_worker(self) -> None:
+        """Drain pending requests and embed them in a single model call."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            pending = [await self._queue.get()]
+            num_texts = len(pending[0][0])
+
+            # Give concurrent workers a short window to join the batch
+            deadline = loop.time() + self.batch_wait
+            while num_texts < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                num_texts += len(item[0])
+
+            texts = [text for item_texts, _ in pending for text in item_texts]
+
+            # Any error fails this batch's callers but must not end the worker,
+            # or every later request would hang until its client times out
+            try:
+                vectors = await loop.run_in_executor(
+                    None, self.embeddings.embed_documents, texts
+                )
+                if len(vectors) != len(texts):
+                    raise RuntimeError(
+                        f"Embedding model returned {len(vectors)} vectors for {len(texts)} texts"
+                    )
+
+                offset = 0
+                for item_texts, future in pending:
+                    if not future.done():
+                        future.set_result(vectors[offset:offset + len(item_texts)])
+                    offset += len(item_texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve embed requests on one client connection."""
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+
+                (length,) = _HEADER.unpack(header)
+                if length > self.max_request_bytes:
+                    # The stream can't be resynchronised without reading the body
+                    logger.warning(f"Rejecting {length}-byte embed request")
+                    writer.write(_encode_message({
+                        "error": f"Request exceeds {self.max_request_bytes} bytes"
+                    }))
+                    await writer.drain()
+                    break
+
+                try:
+                    body = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+
+                try:
+                    request = json.loads(body)
+                    texts = request["texts"]
+                    if not isinstance(texts, list) or not all(
+                        isinstance(text, str) for text in texts
+                    ):
+                        raise ValueError("'texts' must be a list of strings")
+
+                    future = asyncio.get_running_loop().create_future()
+                    await self._queue.put((texts, future))
+                    response = {"embeddings": await future}
+                except Exception as e:
+                    response = {"error": str(e)}
+
+                writer.write(_encode_message(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Listen on the Unix socket until cancelled."""
+        self._queue = asyncio.Queue()
+
+        socket_path = Path(self.socket_path)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if socket_path.exists():
+            if _is_listening(socket_path):
+                raise RuntimeError(
+                    f"Another embedding sidecar is already listening on {socket_path}"
+                )
+            # Stale socket left behind by a sidecar that did not shut down cleanly
+            socket_path.unlink()
+
+        worker = asyncio.create_task(self._batch_worker())
+        server = await asyncio.start_unix_server(
+            self._handle_connection,
+            path=str(socket_path)
+        )
+        os.chmod(socket_path, 0o660)
+        logger.info(f"Embedding sidecar listening on {socket_path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            if socket_path.exists():
+                socket_path.unlink()
+
+
+def main() -> None:
+    """Load the embedding model once and serve it to API workers."""
+    from app.services.vector_store import load_local_embeddings
+
+    logging.basicConfig(level=logging.INFO)
+    sidecar = EmbeddingSidecar(load_local_embeddings())
+
+    try:
+        asyncio.run(sidecar.serve())
+    except RuntimeError as e:
+        logger.error(str(e))
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        logger.info("Embedding sidecar stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import AIMessage, BaseMessage
+from langchain.schema.messages import AIMessageChunk
+from langchain.schema.output import ChatGeneration, ChatGenerationChunk, ChatResult
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _first_chunk(
+    model: BaseChatModel,
+    messages: list[BaseMessage],
+    stop: Optional[list[str]],
+    **kwargs: Any
+) -> tuple[AIMessageChunk, Optional[AsyncIterator]]:
+    """Start streaming from a model and wait for its first token."""
+    stream = model.astream(messages, stop=stop, **kwargs)
+    async for chunk in stream:
+        return chunk, stream
+    return AIMessageChunk(content=""), None
+
+
+async def _close(result: tuple[AIMessageChunk, Optional[AsyncIterator]]) -> None:
+    """Close the stream of a response we are not going to use."""
+    _, stream = result
+    if stream is not None:
+        await stream.aclose()
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Chat model that hedges a slow primary provider with a secondary one.
+
+    If the primary has produced no first token after `hedge_delay` seconds,
+    the same request is sent to the secondary and whichever streams a token
+    first is used; the other request is cancelled. A hard failure of either
+    provider fails over to the other. A `hedge_delay` of None disables
+    hedging and keeps only the failover.
+    """
+
+    primary: BaseChatModel
+    secondary: BaseChatModel
+    hedge_delay: Optional[float] = 2.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        """Synchronous calls cannot be raced, so only fail over."""
+        try:
+            message = self.primary.invoke(messages, stop=stop, **kwargs)
+        except Exception as e:
+            logger.warning(f"Primary LLM failed, failing over: {e}")
+            message = self.secondary.invoke(messages, stop=stop, **kwargs)
+
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        first, stream, winner = await self._race(messages, stop, **kwargs)
+
+        # Tokens are held back until one provider has finished, so callbacks
+        # never see a failed partial answer spliced onto the fallback's
+        chunks = [first]
+        try:
+            if stream is not None:
+                async for chunk in stream:
+                    chunks.append(chunk)
+        except Exception as e:
+            # The winner died mid-response; start over on the other provider
+            fallback = self.secondary if winner is self.primary else self.primary
+            logger.warning(f"LLM failed mid-response, failing over: {e}")
+            chunks = [
+                chunk async for chunk in fallback.astream(messages, stop=stop, **kwargs)
+            ]
+
+        message = AIMessageChunk(content="")
+        for chunk in chunks:
+            message += chunk
+            if run_manager:
+                await run_manager.on_llm_new_token(
+                    chunk.content,
+                    chunk=ChatGenerationChunk(message=chunk)
+                )
+
+        result = AIMessage(
+            content=message.content,
+            additional_kwargs=message.additional_kwargs
+        )
+        return ChatResult(generations=[ChatGeneration(message=result)])
+
+    async def _race(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]],
+        **kwargs: Any
+    ) -> tuple[AIMessageChunk, Optional[AsyncIterator], BaseChatModel]:
+        """Return the first token, its stream and the model that produced it."""
+        tasks: dict[asyncio.Task, BaseChatModel] = {}
+        winner: Optional[asyncio.Task] = None
+
+        def launch(model: BaseChatModel) -> asyncio.Task:
+            task = asyncio.create_task(_first_chunk(model, messages, stop, **kwargs))
+            tasks[task] = model
+            return task
+
+        try:
+            pending = {launch(self.primary)}
+
+            if self.hedge_delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay)
+                if not done:
+                    logger.info(
+                        f"No first token from primary LLM after {self.hedge_delay}s, hedging"
+                    )
+                    pending.add(launch(self.secondary))
+
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        first, stream = task.result()
+                        return first, stream, tasks[task]
+
+                if not pending:
+                    if any(model is self.secondary for model in tasks.values()):
+                        raise task.exception()
+                    # The primary failed before the hedge fired
+                    logger.warning(f"Primary LLM failed, failing over: {task.exception()}")
+                    pending = {launch(self.secondary)}
+        finally:
+            # Cancel or close every response we are not going to use
+            cancelled = []
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                    cancelled.append(task)
+                elif not task.cancelled() and task.exception() is None:
+                    await _close(task.result())
+            await asyncio.gather(*cancelled, return_exceptions=True)
@@ -1,13 +1,29 @@
 from langchain.chains import ConversationalRetrievalChain
+from langchain.chains.question_answering import load_qa_chain
 from langchain.memory import ConversationBufferMemory
+from langchain.schema import Document
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict
+import asyncio
 import logging
 import uuid
 
 from app.config import get_settings
-from app.services.vector_store import get_vector_store
+from app.services.admission import (
+    AdmissionController,
+    AdmissionError,
+    AdmittedChatModel
+)
+from app.services.llm_hedging import HedgedChatModel
+from app.services.reranker import get_reranker, RerankingRetriever
+from app.services.vector_store import (
+    get_embeddings,
+    get_vector_store,
+    batch_search_with_score,
+    require_shards,
+    ShardedRetriever
+)
 from app.api.models.responses import SourceDocument
 
 logger = logging.getLogger(__name__)
@@ -19,28 +35,57 @@ class RAGService:
 
     def __init__(self):
         self.vector_store = get_vector_store()
-        self.llm = self._initialize_llm()
+        # Bounds concurrent LLM calls and how long each may queue for a slot
+        self.admission = AdmissionController()
+        self.llm = AdmittedChatModel(
+            llm=self._initialize_llm(),
+            admission=self.admission
+        )
         # Store conversation memories by conversation_id
         self.conversation_memories: Dict[str, ConversationBufferMemory] = {}
 
     def _initialize_llm(self):
-        """Initialize the LLM based on provider setting."""
-        if settings.llm_provider == "anthropic":
+        """Initialize the LLM, hedged with a fallback provider if one is configured."""
+        primary = self._build_llm(settings.llm_provider, settings.llm_model)
+
+        if not settings.llm_fallback_provider:
+            return primary
+
+        fallback_model = settings.llm_fallback_model
+        if not fallback_model:
+            # Model names are provider-specific, so only inherit within one provider
+            if settings.llm_fallback_provider != settings.llm_provider:
+                raise ValueError(
+                    "LLM_FALLBACK_MODEL must be set when LLM_FALLBACK_PROVIDER "
+                    f"({settings.llm_fallback_provider}) differs from LLM_PROVIDER "
+                    f"({settings.llm_provider})"
+                )
+            fallback_model = settings.llm_model
+
+        return HedgedChatModel(
+            primary=primary,
+            secondary=self._build_llm(settings.llm_fallback_provider, fallback_model),
+            hedge_delay=settings.llm_hedge_delay if settings.llm_hedge_delay > 0 else None
+        )
+
+    def _build_llm(self, provider: str, model: str):
+        """Build a chat model for one provider."""
+        if provider == "anthropic":
             return ChatAnthropic(
                 api_key=settings.anthropic_api_key,
-                model=settings.llm_model,
+                model=model,
                 temperature=settings.llm_temperature,
                 max_tokens=settings.max_tokens
             )
-        elif settings.llm_provider == "openai":
+        elif provider == "openai":
             return ChatOpenAI(
                 api_key=settings.openai_api_key,
-                model=settings.llm_model,
+                model=model,
                 temperature=settings.llm_temperature,
                 max_tokens=settings.max_tokens
             )
         else:
-            raise ValueError(f"Unsupported LLM provider: {settings.llm_provider}")
+            raise ValueError(f"Unsupported LLM provider: {provider}")
 
     def _get_or_create_memory(self, conversation_id: str) -> ConversationBufferMemory:
         """Get existing conversation memory or create new one."""
@@ -56,7 +101,8 @@ class RAGService:
         self,
         question: str,
         conversation_id: Optional[str] = None,
-        document_ids: Optional[list[str]] = None
+        document_ids: Optional[list[str]] = None,
+        workspace_ids: Optional[list[str]] = None
     ) -> dict:
         """
         Answer a question using RAG.
@@ -65,9 +111,13 @@ class RAGService:
             question: User's question
             conversation_id: Optional conversation ID for context
             document_ids: Optional list of specific document IDs to search
+            workspace_ids: Optional list of workspace shards to search
 
         Returns:
             Dictionary with answer, sources, and metadata
+
+        Raises:
+            AdmissionError: The LLM is saturated or the request missed its deadline
         """
         # Generate conversation ID if not provided
         if not conversation_id:
@@ -76,14 +126,34 @@ class RAGService:
         # Get or create conversation memory
         memory = self._get_or_create_memory(conversation_id)
 
+        # Fail fast on unknown workspaces instead of searching nothing
+        if workspace_ids:
+            require_shards(workspace_ids)
+
         # Set up retriever with optional document filtering
         search_kwargs = {"k": settings.retrieval_k}
         if document_ids:
             search_kwargs["filter"] = {"document_id": {"$in": document_ids}}
 
-        retriever = self.vector_store.as_retriever(
-            search_kwargs=search_kwargs
-        )
+        if settings.reranker_enabled:
+            # Fetch a wider candidate set and keep the cross-encoder's top-k
+            retriever = RerankingRetriever(
+                k=search_kwargs["k"],
+                fetch_k=settings.rerank_candidates,
+                workspace_ids=workspace_ids,
+                filter_dict=search_kwargs.get("filter")
+            )
+        elif workspace_ids:
+            # Route to the requested shards only, merging their top-k
+            retriever = ShardedRetriever(
+                workspace_ids=workspace_ids,
+                k=search_kwargs["k"],
+                filter_dict=search_kwargs.get("filter")
+            )
+        else:
+            retriever = self.vector_store.as_retriever(
+                search_kwargs=search_kwargs
+            )
 
         # Create conversational chain
         qa_chain = ConversationalRetrievalChain.from_llm(
@@ -96,7 +166,9 @@ class RAGService:
 
         # Get response
         try:
-            result = qa_chain({"question": question})
+            # Condense and answer calls share one LLM slot and one deadline
+            async with self.admission.request():
+                result = await qa_chain.acall({"question": question})
 
             # Format source documents
             sources = self._format_sources(result.get("source_documents", []))
@@ -108,10 +180,116 @@ class RAGService:
                 "message_id": f"msg_{uuid.uuid4().hex[:12]}"
             }
 
+        except AdmissionError:
+            # Expected under load; the route turns it into 429/503/504
+            raise
+
         except Exception as e:
             logger.error(f"Error in RAG pipeline: {e}")
             raise
 
+    async def answer_batch(
+        self,
+        questions: list[str],
+        document_ids: Optional[list[str]] = None,
+        workspace_ids: Optional[list[str]] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Answer independent questions against a shared document scope.
+
+        All questions are embedded in one pass and retrieved together before
+        any answer is generated, so retrieval errors surface here rather than
+        per question.
+
+        Args:
+            questions: Questions to answer; each is answered without memory
+            document_ids: Optional list of specific document IDs to search
+            workspace_ids: Optional list of workspace shards to search
+
+        Returns:
+            Async iterator yielding one result dictionary per question,
+            in completion order
+        """
+        filter_dict = {"document_id": {"$in": document_ids}} if document_ids else None
+
+        # embed_documents batches the whole list through the model at once
+        embeddings = await asyncio.to_thread(
+            get_embeddings().embed_documents,
+            questions
+        )
+        retrieved = await asyncio.to_thread(
+            batch_search_with_score,
+            embeddings,
+            workspace_ids,
+            k=(
+                settings.rerank_candidates if settings.reranker_enabled
+                else settings.retrieval_k
+            ),
+            filter_dict=filter_dict
+        )
+
+        if settings.reranker_enabled:
+            documents = await asyncio.to_thread(
+                get_reranker().rerank_many,
+                questions,
+                retrieved,
+                settings.retrieval_k
+            )
+        else:
+            documents = [[doc for doc, _ in results] for results in retrieved]
+
+        return self._answer_retrieved(questions, documents)
+
+    async def _answer_retrieved(
+        self,
+        questions: list[str],
+        retrieved: list[list[Document]]
+    ) -> AsyncIterator[dict]:
+        """Generate answers with bounded concurrency, yielding as they finish."""
+        qa_chain = load_qa_chain(self.llm, chain_type="stuff")
+        semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+        async def answer(index: int, question: str, docs: list[Document]) -> dict:
+            async with semaphore:
+                try:
+                    async with self.admission.request():
+                        result = await qa_chain.acall({
+                            "input_documents": docs,
+                            "question": question
+                        })
+                except Exception as e:
+                    if isinstance(e, AdmissionError):
+                        logger.warning(f"Batch question {index} not admitted: {e}")
+                    else:
+                        logger.error(f"Error answering batch question {index}: {e}")
+                    return {
+                        "index": index,
+                        "question": question,
+                        "error": str(e)
+                    }
+
+            return {
+                "index": index,
+                "question": question,
+                "answer": result["output_text"],
+                "sources": self._format_sources(docs),
+                "message_id": f"msg_{uuid.uuid4().hex[:12]}"
+            }
+
+        tasks = [
+            asyncio.create_task(answer(index, question, docs))
+            for index, (question, docs) in enumerate(zip(questions, retrieved))
+        ]
+
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # The client may disconnect before the batch finishes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     def _format_sources(self, source_docs: list) -> list[SourceDocument]:
         """Format source documents for response."""
         formatted_sources = []
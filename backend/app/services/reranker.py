@@ -0,0 +1,178 @@
+from langchain.schema import Document
+from langchain.schema.retriever import BaseRetriever
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+import hashlib
+import logging
+import threading
+
+from app.config import get_settings
+from app.services.vector_store import get_vector_store, search_shards_with_score
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@lru_cache()
+def get_cross_encoder():
+    """Get cached cross-encoder model."""
+    from sentence_transformers import CrossEncoder
+
+    logger.info(f"Loading reranker model: {settings.reranker_model}")
+    return CrossEncoder(settings.reranker_model, device="cpu")
+
+
+class Reranker:
+    """Cross-encoder reranking with a per-(query, chunk) score cache."""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        skip_gap: Optional[float] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.batch_size = batch_size or settings.rerank_batch_size
+        self.skip_gap = skip_gap if skip_gap is not None else settings.rerank_skip_gap
+        self.cache_size = cache_size or settings.rerank_cache_size
+
+        # LRU of cross-encoder scores; retrievers run in worker threads
+        self._cache: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(query: str, doc: Document) -> str:
+        pair = f"{query}\0{doc.page_content}".encode("utf-8")
+        return hashlib.sha1(pair).hexdigest()
+
+    def _order_is_clear(
+        self,
+        candidates: list[tuple[Document, float]],
+        top_n: int
+    ) -> bool:
+        """Whether the first-stage distances already separate the top_n."""
+        if len(candidates) <= top_n:
+            return True
+        return candidates[top_n][1] - candidates[top_n - 1][1] >= self.skip_gap
+
+    def rerank_many(
+        self,
+        queries: list[str],
+        candidates_per_query: list[list[tuple[Document, float]]],
+        top_n: int
+    ) -> list[list[Document]]:
+        """
+        Rerank first-stage candidates for several queries at once.
+
+        Uncached pairs from every query are scored in shared batches. A query
+        whose first-stage distances already put a clear gap after the top_n
+        candidates is not reranked.
+
+        Args:
+            queries: Search queries
+            candidates_per_query: (Document, distance) tuples per query, closest first
+            top_n: Number of documents to keep per query
+
+        Returns:
+            The top_n documents per query, best first
+        """
+        to_rerank = [
+            index for index, candidates in enumerate(candidates_per_query)
+            if not self._order_is_clear(candidates, top_n)
+        ]
+
+        keys: dict[int, list[str]] = {}
+        scores: dict[str, float] = {}
+        missing: dict[str, tuple[str, str]] = {}
+        with self._lock:
+            for index in to_rerank:
+                query = queries[index]
+                keys[index] = []
+                for doc, _ in candidates_per_query[index]:
+                    key = self._cache_key(query, doc)
+                    keys[index].append(key)
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                        scores[key] = self._cache[key]
+                    elif key not in scores:
+                        missing[key] = (query, doc.page_content)
+
+        if missing:
+            predicted = get_cross_encoder().predict(
+                list(missing.values()),
+                batch_size=self.batch_size
+            )
+            new_scores = dict(zip(missing, (float(score) for score in predicted)))
+            scores.update(new_scores)
+
+            with self._lock:
+                self._cache.update(new_scores)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if len(to_rerank) < len(queries):
+            logger.debug(
+                f"Skipped reranking for {len(queries) - len(to_rerank)} of "
+                f"{len(queries)} queries with a clear first-stage cut"
+            )
+
+        reranked = []
+        for index, candidates in enumerate(candidates_per_query):
+            if index not in keys:
+                reranked.append([doc for doc, _ in candidates[:top_n]])
+                continue
+            ranked = sorted(
+                zip(candidates, keys[index]),
+                key=lambda item: scores[item[1]],
+                reverse=True
+            )
+            reranked.append([doc for (doc, _), _ in ranked[:top_n]])
+
+        return reranked
+
+    def rerank(
+        self,
+        query: str,
+        candidates: list[tuple[Document, float]],
+        top_n: int
+    ) -> list[Document]:
+        """Rerank first-stage candidates for one query."""
+        return self.rerank_many([query], [candidates], top_n)[0]
+
+
+@lru_cache()
+def get_reranker() -> Reranker:
+    """Get the shared reranker, so its score cache spans requests."""
+    return Reranker()
+
+
+class RerankingRetriever(BaseRetriever):
+    """Two-stage retriever: wide dense search, then cross-encoder rerank."""
+
+    k: int = 4
+    fetch_k: int = 20
+    workspace_ids: Optional[list[str]] = None
+    filter_dict: Optional[dict] = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        if self.workspace_ids:
+            candidates = search_shards_with_score(
+                query,
+                self.workspace_ids,
+                k=self.fetch_k,
+                filter_dict=self.filter_dict
+            )
+        else:
+            candidates = get_vector_store().similarity_search_with_score(
+                query,
+                k=self.fetch_k,
+                filter=self.filter_dict
+            )
+
+        return get_reranker().rerank(query, candidates, self.k)
@@ -1,19 +1,25 @@
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
+from langchain.schema.retriever import BaseRetriever
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+import heapq
 import logging
+import threading
 from functools import lru_cache
 
 from app.config import get_settings
+from app.services.embedding_sidecar import SidecarEmbeddings
+from app.services.workspaces import get_shard_collection_name
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-@lru_cache()
-def get_embeddings():
-    """Get cached embedding model."""
+def load_local_embeddings() -> HuggingFaceEmbeddings:
+    """Load the embedding model into this process."""
     logger.info(f"Loading embedding model: {settings.embedding_model}")
     return HuggingFaceEmbeddings(
         model_name=settings.embedding_model,
@@ -23,25 +29,240 @@ def get_embeddings():
 
 
 @lru_cache()
-def get_vector_store() -> Chroma:
-    """Get or create ChromaDB vector store."""
+def get_embeddings():
+    """Get cached embedding model, or a client for the shared sidecar."""
+    if settings.embedding_backend == "local":
+        return load_local_embeddings()
+    elif settings.embedding_backend == "sidecar":
+        logger.info(f"Using embedding sidecar at {settings.embedding_socket_path}")
+        return SidecarEmbeddings()
+    else:
+        raise ValueError(f"Unsupported embedding backend: {settings.embedding_backend}")
+
+
+class ShardNotFoundError(LookupError):
+    """One or more requested workspace shards do not exist."""
+
+    def __init__(self, workspace_ids: list[str]):
+        super().__init__(f"Unknown workspace(s): {', '.join(workspace_ids)}")
+        self.workspace_ids = workspace_ids
+
+
+@lru_cache()
+def get_chroma_client():
+    """Get the Chroma client shared by every shard."""
+    import chromadb
+
+    return chromadb.PersistentClient(path=settings.chroma_persist_dir)
+
+
+@lru_cache(maxsize=None)
+def get_vector_store(workspace_id: Optional[str] = None) -> Chroma:
+    """
+    Get or create the ChromaDB vector store for a workspace shard.
+
+    This creates the shard's collection if it is missing, so only write
+    paths (upload, ingest) should call it with a workspace ID; read and
+    delete paths use `get_existing_vector_store`.
+    """
     embeddings = get_embeddings()
+    collection_name = get_shard_collection_name(workspace_id)
 
     vector_store = Chroma(
-        collection_name=settings.collection_name,
-        embedding_function=embeddings,
-        persist_directory=settings.chroma_persist_dir
+        client=get_chroma_client(),
+        collection_name=collection_name,
+        embedding_function=embeddings
     )
 
-    logger.info("Vector store initialized")
+    logger.info(f"Vector store initialized for collection {collection_name}")
     return vector_store
 
 
+def _get_collection(vector_store: Chroma):
+    """
+    The raw Chroma collection behind a langchain store.
+
+    Needed for metadata-filtered deletes (langchain's `delete` only forwards
+    IDs) and multi-embedding queries.
+    """
+    return vector_store._collection
+
+
+# Shards confirmed to exist; collections are never dropped, so this only grows
+_known_shards: set[str] = set()
+_known_shards_lock = threading.Lock()
+
+
+def require_shards(workspace_ids: list[str]) -> None:
+    """
+    Check that every workspace shard exists, without creating any.
+
+    Raises:
+        ShardNotFoundError: Listing the workspaces that have no collection
+    """
+    missing = []
+    for workspace_id in dict.fromkeys(workspace_ids):
+        with _known_shards_lock:
+            if workspace_id in _known_shards:
+                continue
+        try:
+            get_chroma_client().get_collection(
+                get_shard_collection_name(workspace_id)
+            )
+        except ValueError:
+            missing.append(workspace_id)
+            continue
+        with _known_shards_lock:
+            _known_shards.add(workspace_id)
+
+    if missing:
+        raise ShardNotFoundError(missing)
+
+
+def get_existing_vector_store(workspace_id: Optional[str] = None) -> Chroma:
+    """Get the vector store for a shard that must already exist."""
+    if workspace_id:
+        require_shards([workspace_id])
+    return get_vector_store(workspace_id)
+
+
+# Shared pool for fanning a query out across shards
+_shard_executor = ThreadPoolExecutor(
+    max_workers=settings.shard_search_workers,
+    thread_name_prefix="shard-search"
+)
+
+
+def search_shards_with_score(
+    query: str,
+    workspace_ids: list[str],
+    k: int = 4,
+    filter_dict: Optional[dict] = None
+) -> list[tuple[Document, float]]:
+    """
+    Search several workspace shards in parallel and merge the top-k.
+
+    The query is embedded once and the same vector is sent to every shard.
+
+    Args:
+        query: Search query
+        workspace_ids: Shards to search
+        k: Number of results to return across all shards
+        filter_dict: Metadata filters applied within each shard
+
+    Returns:
+        List of (Document, distance) tuples, closest first
+
+    Raises:
+        ShardNotFoundError: A requested workspace has no collection
+    """
+    embedding = get_embeddings().embed_query(query)
+    return batch_search_with_score([embedding], workspace_ids, k, filter_dict)[0]
+
+
+def batch_search_with_score(
+    embeddings: list[list[float]],
+    workspace_ids: Optional[list[str]] = None,
+    k: int = 4,
+    filter_dict: Optional[dict] = None
+) -> list[list[tuple[Document, float]]]:
+    """
+    Search many pre-computed query embeddings at once.
+
+    Each shard receives a single Chroma query carrying every embedding;
+    results are then merged per query across shards.
+
+    Args:
+        embeddings: Query embeddings
+        workspace_ids: Shards to search; None searches the shared collection
+        k: Number of results to return per query
+        filter_dict: Metadata filters applied within each shard
+
+    Returns:
+        One list of (Document, distance) tuples per query, closest first
+
+    Raises:
+        ShardNotFoundError: A requested workspace has no collection
+    """
+    if not embeddings:
+        return []
+
+    shards = list(dict.fromkeys(workspace_ids)) if workspace_ids else [None]
+    if workspace_ids:
+        require_shards(shards)
+
+    def search(workspace_id: Optional[str]) -> list[list[tuple[Document, float]]]:
+        collection = _get_collection(get_vector_store(workspace_id))
+        results = collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            where=filter_dict,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [
+                (Document(page_content=text, metadata=metadata or {}), distance)
+                for text, metadata, distance in zip(texts, metadatas, distances)
+            ]
+            for texts, metadatas, distances in zip(
+                results["documents"],
+                results["metadatas"],
+                results["distances"]
+            )
+        ]
+
+    if len(shards) == 1:
+        shard_results = [search(shards[0])]
+    else:
+        shard_results = list(_shard_executor.map(search, shards))
+
+    # Chroma returns distances, so smaller is better
+    return [
+        heapq.nsmallest(
+            k,
+            (result for results in per_shard for result in results),
+            key=lambda result: result[1]
+        )
+        for per_shard in zip(*shard_results)
+    ]
+
+
+class ShardedRetriever(BaseRetriever):
+    """Retriever that routes a query to the given workspace shards only."""
+
+    workspace_ids: list[str]
+    k: int = 4
+    filter_dict: Optional[dict] = None
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        results = search_shards_with_score(
+            query,
+            self.workspace_ids,
+            k=self.k,
+            filter_dict=self.filter_dict
+        )
+        return [doc for doc, _ in results]
+
+
 class VectorStoreService:
     """Service for vector store operations."""
 
-    def __init__(self):
-        self.vector_store = get_vector_store()
+    def __init__(self, workspace_id: Optional[str] = None, create: bool = True):
+        """
+        Args:
+            workspace_id: Workspace shard to operate on; None is the shared collection
+            create: Create the shard if missing; otherwise raise ShardNotFoundError
+        """
+        self.workspace_id = workspace_id
+        if create:
+            self.vector_store = get_vector_store(workspace_id)
+        else:
+            self.vector_store = get_existing_vector_store(workspace_id)
 
     def add_documents(
         self,
@@ -61,12 +282,69 @@ class VectorStoreService:
         # Add document_id to metadata
         for doc in documents:
             doc.metadata["document_id"] = document_id
+            if self.workspace_id:
+                doc.metadata["workspace_id"] = self.workspace_id
 
         ids = self.vector_store.add_documents(documents)
         logger.info(f"Added {len(ids)} chunks for document {document_id}")
 
         return ids
 
+    def add_documents_bulk(
+        self,
+        documents_by_id: dict[str, list[Document]],
+        batch_size: Optional[int] = None
+    ) -> list[str]:
+        """
+        Add chunks from many documents in a few large embed-and-write calls.
+
+        Existing chunks of every document in the batch are deleted first and
+        chunk IDs are derived from the document ID and chunk index, so
+        re-adding a document replaces its chunks even if it now has fewer.
+
+        Args:
+            documents_by_id: Chunked documents keyed by document ID
+            batch_size: Max chunks per embed/write call; defaults to
+                INGEST_BATCH_SIZE so one huge document can't exceed the
+                embedding request or Chroma upsert limits
+
+        Returns:
+            List of chunk IDs
+        """
+        documents = []
+        chunk_ids = []
+        for document_id, chunks in documents_by_id.items():
+            for idx, doc in enumerate(chunks):
+                doc.metadata["document_id"] = document_id
+                if self.workspace_id:
+                    doc.metadata["workspace_id"] = self.workspace_id
+                documents.append(doc)
+                chunk_ids.append(f"{document_id}_{idx}")
+
+        if not documents_by_id:
+            return []
+
+        # Drop stale trailing chunks left by an earlier, longer version
+        _get_collection(self.vector_store).delete(
+            where={"document_id": {"$in": list(documents_by_id)}}
+        )
+
+        if not documents:
+            return []
+
+        batch_size = batch_size or settings.ingest_batch_size
+        ids = []
+        for start in range(0, len(documents), batch_size):
+            ids.extend(self.vector_store.add_documents(
+                documents[start:start + batch_size],
+                ids=chunk_ids[start:start + batch_size]
+            ))
+        logger.info(
+            f"Added {len(ids)} chunks for {len(documents_by_id)} documents"
+        )
+
+        return ids
+
     def similarity_search(
         self,
         query: str,
@@ -109,7 +387,7 @@ class VectorStoreService:
 
     def delete_by_document_id(self, document_id: str) -> None:
         """Delete all chunks for a specific document."""
-        self.vector_store.delete(
+        _get_collection(self.vector_store).delete(
             where={"document_id": document_id}
         )
         logger.info(f"Deleted chunks for document {document_id}")
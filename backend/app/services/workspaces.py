@@ -0,0 +1,39 @@
+from typing import Optional
+import re
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Chroma collection names are limited to 63 characters
+MAX_COLLECTION_NAME_LENGTH = 63
+
+# Workspace IDs become part of a Chroma collection name, which must start
+# and end with an alphanumeric character. Matched with re.fullmatch: a `$`
+# anchor would also accept a trailing newline.
+WORKSPACE_ID_PATTERN = r"[A-Za-z0-9](?:[A-Za-z0-9_-]{0,38}[A-Za-z0-9])?"
+
+
+def get_shard_collection_name(workspace_id: Optional[str] = None) -> str:
+    """Map a workspace to its collection; no workspace means the shared collection."""
+    if not workspace_id:
+        return settings.collection_name
+
+    collection_name = f"{settings.collection_name}_{workspace_id}"
+    if len(collection_name) > MAX_COLLECTION_NAME_LENGTH:
+        raise ValueError(
+            f"Workspace ID {workspace_id!r} is too long for collection "
+            f"{settings.collection_name!r}"
+        )
+    return collection_name
+
+
+def validate_workspace_id(workspace_id: str) -> str:
+    """Reject workspace IDs that would not make a valid collection name."""
+    if not re.fullmatch(WORKSPACE_ID_PATTERN, workspace_id):
+        raise ValueError(
+            "Workspace ID must be 1-40 letters, digits, '_' or '-', "
+            "starting and ending with a letter or digit"
+        )
+    get_shard_collection_name(workspace_id)
+    return workspace_id
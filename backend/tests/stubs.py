@@ -0,0 +1,111 @@
+"""Local stand-ins for LLM providers, used by the tests and benchmarks."""
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import AIMessage, BaseMessage
+from langchain.schema.messages import AIMessageChunk
+from langchain.schema.output import ChatGeneration, ChatGenerationChunk, ChatResult
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import random
+import time
+
+
+class StubProviderError(RuntimeError):
+    """Raised by a stub provider configured to fail."""
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Streaming chat model with configurable delay and failures.
+
+    Deterministic by default; `jitter`, `tail_probability` and
+    `failure_probability` draw from `random` to model a real provider's
+    latency tail for the benchmarks.
+    """
+
+    label: str = "stub"
+    first_token_delay: float = 0.0
+    tokens: int = 3
+    token_interval: float = 0.0
+    fail_before_first_token: bool = False
+    fail_after_tokens: Optional[int] = None
+
+    # Sampled behaviour
+    jitter: float = 0.0  # First-token delay varies by +/- this fraction
+    tail_latency: float = 0.0
+    tail_probability: float = 0.0
+    failure_probability: float = 0.0
+
+    # Observed behaviour, for assertions
+    calls: int = 0
+    cancelled: bool = False
+    seen_kwargs: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _sample_first_token_delay(self) -> float:
+        if self.tail_probability and random.random() < self.tail_probability:
+            return self.tail_latency
+        if self.jitter:
+            return random.uniform(1 - self.jitter, 1 + self.jitter) * self.first_token_delay
+        return self.first_token_delay
+
+    def _fails_before_first_token(self) -> bool:
+        return self.fail_before_first_token or (
+            self.failure_probability > 0 and random.random() < self.failure_probability
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        self.calls += 1
+        self.seen_kwargs.append(kwargs)
+        time.sleep(self._sample_first_token_delay())
+        if self._fails_before_first_token():
+            raise StubProviderError(f"{self.label} failed")
+        message = AIMessage(content=f"{self.label} " * self.tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        content = ""
+        async for chunk in self._astream(messages, stop=stop, **kwargs):
+            content += chunk.message.content
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        self.seen_kwargs.append(kwargs)
+        try:
+            await asyncio.sleep(self._sample_first_token_delay())
+            if self._fails_before_first_token():
+                raise StubProviderError(f"{self.label} failed")
+
+            for index in range(self.tokens):
+                if self.fail_after_tokens is not None and index == self.fail_after_tokens:
+                    raise StubProviderError(f"{self.label} failed mid-stream")
+                yield ChatGenerationChunk(message=AIMessageChunk(content=f"{self.label} "))
+                await asyncio.sleep(self.token_interval)
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled = True
+            raise
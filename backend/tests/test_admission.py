@@ -0,0 +1,217 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain.schema import HumanMessage
+
+from app.api.routes import chat
+from app.services.admission import (
+    AdmissionController,
+    AdmittedChatModel,
+    DeadlineExceededError,
+    QueueFullError,
+    QueueTimeoutError
+)
+from tests.stubs import StubChatModel
+
+
+async def _hold(release: asyncio.Event) -> str:
+    await release.wait()
+    return "done"
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=1,
+        queue_timeout=5,
+        request_timeout=5
+    )
+    release = asyncio.Event()
+
+    running = asyncio.create_task(controller.run(lambda: _hold(release)))
+    queued = asyncio.create_task(controller.run(lambda: _hold(release)))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFullError) as exc_info:
+        await controller.run(lambda: _hold(release))
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    assert await asyncio.gather(running, queued) == ["done", "done"]
+
+    stats = controller.stats()
+    assert stats["admitted"] == 2
+    assert stats["rejected_queue_full"] == 1
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_is_recorded_in_queue_wait():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=4,
+        queue_timeout=0.05,
+        request_timeout=5
+    )
+    release = asyncio.Event()
+    running = asyncio.create_task(controller.run(lambda: _hold(release)))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueTimeoutError):
+        await controller.run(lambda: _hold(release))
+
+    stats = controller.stats()
+    assert stats["rejected_queue_timeout"] == 1
+    assert stats["queue_wait_ms"]["max"] >= 50
+    assert stats["queue_wait_ms"]["p99"] >= 50
+
+    release.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_releases_the_slot():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=0,
+        queue_timeout=1,
+        request_timeout=0.05
+    )
+
+    with pytest.raises(DeadlineExceededError):
+        await controller.run(lambda: asyncio.sleep(1))
+
+    assert controller.stats()["deadline_exceeded"] == 1
+    assert await controller.run(lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_scales_with_service_time():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=0,
+        queue_timeout=1,
+        request_timeout=5
+    )
+    await controller.run(lambda: asyncio.sleep(0))
+    controller._service_times.extend([3.0] * 10)
+
+    release = asyncio.Event()
+    running = asyncio.create_task(controller.run(lambda: _hold(release)))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFullError) as exc_info:
+        await controller.run(lambda: _hold(release))
+    assert exc_info.value.retry_after >= 2
+
+    release.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_admitted_chat_model_gates_llm_calls():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=0,
+        queue_timeout=1,
+        request_timeout=5
+    )
+    llm = AdmittedChatModel(
+        llm=StubChatModel(label="slow", first_token_delay=0.1),
+        admission=controller
+    )
+    messages = [HumanMessage(content="hi")]
+
+    first = asyncio.create_task(llm.ainvoke(messages))
+    await asyncio.sleep(0.01)
+    with pytest.raises(QueueFullError):
+        await llm.ainvoke(messages)
+
+    assert (await first).content.startswith("slow")
+    assert controller.stats()["admitted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_scope_reuses_its_slot_when_queue_is_full():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=0,
+        queue_timeout=1,
+        request_timeout=5
+    )
+
+    condensed = asyncio.Event()
+    retrieved = asyncio.Event()
+
+    async def conversation() -> str:
+        async with controller.request():
+            await controller.run(lambda: asyncio.sleep(0))
+            condensed.set()
+            await retrieved.wait()
+            return await controller.run(lambda: asyncio.sleep(0, result="answer"))
+
+    request = asyncio.create_task(conversation())
+    await condensed.wait()
+
+    # The slot is still held between calls, so another request is turned away
+    with pytest.raises(QueueFullError):
+        await controller.run(lambda: asyncio.sleep(0))
+
+    retrieved.set()
+    assert await request == "answer"
+
+    stats = controller.stats()
+    assert stats["admitted"] == 1
+    assert stats["active"] == 0
+    assert await controller.run(lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_request_scope_shares_one_deadline():
+    controller = AdmissionController(
+        max_concurrency=1,
+        max_queue_depth=0,
+        queue_timeout=1,
+        request_timeout=0.15
+    )
+
+    with pytest.raises(DeadlineExceededError):
+        async with controller.request():
+            await controller.run(lambda: asyncio.sleep(0.1))
+            # Fits the per-call budget, but not what is left of the request's
+            await controller.run(lambda: asyncio.sleep(0.1))
+
+    assert controller.stats()["deadline_exceeded"] == 1
+    assert controller.stats()["active"] == 0
+
+
+class _SaturatedRAGService:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def ask_question(self, **kwargs):
+        raise self.error
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [
+        (QueueFullError("queue full", retry_after=7), 429),
+        (QueueTimeoutError("no slot", retry_after=3), 503),
+        (DeadlineExceededError("too slow", retry_after=2), 504)
+    ]
+)
+def test_chat_maps_admission_errors_to_status_and_retry_after(error, status_code):
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    app.dependency_overrides[chat.get_rag_service] = lambda: _SaturatedRAGService(error)
+
+    response = TestClient(app).post("/chat/", json={"question": "Anything?"})
+
+    assert response.status_code == status_code
+    assert response.headers["Retry-After"] == str(error.retry_after)
+    assert response.json()["detail"] == str(error)
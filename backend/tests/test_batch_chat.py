@@ -0,0 +1,200 @@
+import asyncio
+import json
+from typing import Any, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain.chat_models.base import BaseChatModel
+from langchain.schema import AIMessage, BaseMessage, Document
+from langchain.schema.output import ChatGeneration, ChatResult
+
+from app.api.routes import chat
+from app.services import rag_service
+from app.services.admission import AdmissionController, AdmittedChatModel
+from app.services.rag_service import RAGService
+from app.services.vector_store import ShardNotFoundError
+
+
+class _QuestionAwareChatModel(BaseChatModel):
+    """
+    Answers by question: "slow" waits, "hang" never returns, "fail" raises.
+
+    Records peak concurrency and how many calls were cancelled.
+    """
+
+    active: int = 0
+    peak: int = 0
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "question-aware"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        question = messages[-1].content.rsplit("Question:", 1)[-1]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            if "hang" in question:
+                await asyncio.sleep(60)
+            await asyncio.sleep(0.1 if "slow" in question else 0.02)
+            if "fail" in question:
+                raise RuntimeError("provider error")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+        message = AIMessage(content=f"answer to {question.split()[0]}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _service(model: BaseChatModel) -> RAGService:
+    service = RAGService.__new__(RAGService)
+    service.admission = AdmissionController(
+        max_concurrency=8,
+        max_queue_depth=8,
+        queue_timeout=5,
+        request_timeout=5
+    )
+    service.llm = AdmittedChatModel(llm=model, admission=service.admission)
+    return service
+
+
+def _docs() -> list[Document]:
+    return [Document(page_content="context", metadata={"document_id": "doc_1", "filename": "a.txt"})]
+
+
+@pytest.mark.asyncio
+async def test_results_arrive_in_completion_order_with_their_index(monkeypatch):
+    monkeypatch.setattr(rag_service.settings, "batch_max_concurrency", 4)
+    service = _service(_QuestionAwareChatModel())
+    questions = ["slow one", "quick two", "fail three"]
+
+    results = [
+        result async for result in service._answer_retrieved(questions, [_docs()] * 3)
+    ]
+
+    assert results[-1]["index"] == 0
+    assert results[-1]["answer"] == "answer to slow"
+    by_index = {result["index"]: result for result in results}
+    assert by_index[1]["answer"] == "answer to quick"
+    assert by_index[1]["sources"][0].document_id == "doc_1"
+    assert by_index[2] == {"index": 2, "question": "fail three", "error": "provider error"}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(rag_service.settings, "batch_max_concurrency", 2)
+    model = _QuestionAwareChatModel()
+    service = _service(model)
+    questions = [f"quick {i}" for i in range(6)]
+
+    results = [
+        result async for result in service._answer_retrieved(questions, [_docs()] * 6)
+    ]
+
+    assert sorted(result["index"] for result in results) == list(range(6))
+    assert model.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_outstanding_answers(monkeypatch):
+    monkeypatch.setattr(rag_service.settings, "batch_max_concurrency", 4)
+    model = _QuestionAwareChatModel()
+    service = _service(model)
+    results = service._answer_retrieved(["quick", "hang", "hang"], [_docs()] * 3)
+
+    first = await results.__anext__()
+    await results.aclose()
+
+    assert first["index"] == 0
+    assert model.cancelled == 2
+    assert model.active == 0
+    assert service.admission.stats()["active"] == 0
+
+
+class _BatchRAGService:
+    def __init__(self, results: Optional[list[dict]] = None, error: Optional[Exception] = None):
+        self.results = results or []
+        self.error = error
+        self.closed = False
+
+    async def answer_batch(self, **kwargs):
+        if self.error:
+            raise self.error
+        return self._stream()
+
+    async def _stream(self):
+        try:
+            for result in self.results:
+                yield result
+        finally:
+            self.closed = True
+
+
+def _client(service) -> TestClient:
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    app.dependency_overrides[chat.get_rag_service] = lambda: service
+    return TestClient(app)
+
+
+def test_batch_route_streams_one_ndjson_line_per_question():
+    service = _BatchRAGService([
+        {"index": 1, "question": "second", "answer": "two", "sources": [], "message_id": "msg_2"},
+        {"index": 0, "question": "first", "error": "provider error"}
+    ])
+
+    response = _client(service).post(
+        "/chat/batch",
+        json={"questions": ["first", "second"], "workspace_ids": ["team_a"]}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [1, 0]
+    assert lines[0]["answer"] == "two"
+    assert lines[1]["error"] == "provider error"
+    assert lines[1]["answer"] is None
+    assert service.closed
+
+
+def test_batch_route_maps_unknown_workspace_to_404():
+    service = _BatchRAGService(error=ShardNotFoundError(["missing"]))
+
+    response = _client(service).post(
+        "/chat/batch",
+        json={"questions": ["first"], "workspace_ids": ["missing"]}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Unknown workspace(s): missing"
+
+
+def test_batch_route_rejects_empty_questions():
+    response = _client(_BatchRAGService()).post("/chat/batch", json={"questions": [""]})
+
+    assert response.status_code == 422
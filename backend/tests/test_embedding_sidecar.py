@@ -0,0 +1,137 @@
+import asyncio
+import json
+import socket
+from contextlib import asynccontextmanager
+
+import pytest
+from langchain.schema.embeddings import Embeddings
+
+from app.services.embedding_sidecar import (
+    _HEADER,
+    EmbeddingSidecar,
+    SidecarEmbeddings,
+    _is_listening,
+    _recv_exactly
+)
+
+
+class _FakeEmbeddings(Embeddings):
+    """Embeds a text as [len(text)], recording every model call."""
+
+    def __init__(self, drop_last_once: bool = False):
+        self.calls: list[list[str]] = []
+        self.drop_last_once = drop_last_once
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        vectors = [[float(len(text))] for text in texts]
+        if self.drop_last_once:
+            self.drop_last_once = False
+            return vectors[:-1]
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+@asynccontextmanager
+async def _running(sidecar: EmbeddingSidecar):
+    server = asyncio.create_task(sidecar.serve())
+    socket_path = sidecar.socket_path
+    while not await asyncio.to_thread(_is_listening, socket_path):
+        await asyncio.sleep(0.01)
+    try:
+        yield SidecarEmbeddings(socket_path=socket_path, timeout=5)
+    finally:
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+
+def _raw_request(socket_path, body: bytes) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(socket_path)
+        sock.sendall(_HEADER.pack(len(body)) + body)
+        (length,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+        return json.loads(_recv_exactly(sock, length))
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "embed.sock")
+
+
+@pytest.mark.asyncio
+async def test_batch_results_are_split_back_to_each_caller(socket_path):
+    embeddings = _FakeEmbeddings()
+    sidecar = EmbeddingSidecar(embeddings, socket_path=socket_path, batch_wait_ms=200)
+
+    async with _running(sidecar) as client:
+        results = await asyncio.gather(
+            asyncio.to_thread(client.embed_documents, ["a", "bb"]),
+            asyncio.to_thread(client.embed_documents, ["ccc"]),
+            asyncio.to_thread(client.embed_query, "dddd")
+        )
+
+    assert results == [[[1.0], [2.0]], [[3.0]], [4.0]]
+    assert len(embeddings.calls) == 1
+    assert sorted(embeddings.calls[0]) == ["a", "bb", "ccc", "dddd"]
+
+
+@pytest.mark.asyncio
+async def test_oversized_frame_is_rejected(socket_path):
+    sidecar = EmbeddingSidecar(_FakeEmbeddings(), socket_path=socket_path)
+    sidecar.max_request_bytes = 64
+
+    async with _running(sidecar) as client:
+        with pytest.raises(RuntimeError, match="exceeds 64 bytes"):
+            await asyncio.to_thread(client.embed_documents, ["x" * 100])
+        # The server stays up for well-formed requests
+        assert await asyncio.to_thread(client.embed_query, "ok") == [2.0]
+
+
+@pytest.mark.asyncio
+async def test_malformed_requests_get_an_error_reply(socket_path):
+    sidecar = EmbeddingSidecar(_FakeEmbeddings(), socket_path=socket_path)
+
+    async with _running(sidecar):
+        bad_json = await asyncio.to_thread(_raw_request, socket_path, b"not json")
+        bad_texts = await asyncio.to_thread(
+            _raw_request, socket_path, json.dumps({"texts": [1, 2]}).encode()
+        )
+
+    assert "error" in bad_json
+    assert bad_texts == {"error": "'texts' must be a list of strings"}
+
+
+@pytest.mark.asyncio
+async def test_refuses_to_replace_a_live_sidecar(socket_path):
+    sidecar = EmbeddingSidecar(_FakeEmbeddings(), socket_path=socket_path)
+
+    async with _running(sidecar) as client:
+        with pytest.raises(RuntimeError, match="already listening"):
+            await EmbeddingSidecar(_FakeEmbeddings(), socket_path=socket_path).serve()
+        assert await asyncio.to_thread(client.embed_query, "still here") == [10.0]
+
+
+@pytest.mark.asyncio
+async def test_replaces_a_stale_socket(socket_path):
+    # Bound but never listening, like a socket left by a crashed sidecar
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    sidecar = EmbeddingSidecar(_FakeEmbeddings(), socket_path=socket_path)
+    async with _running(sidecar) as client:
+        assert await asyncio.to_thread(client.embed_query, "fresh") == [5.0]
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_bad_model_result(socket_path):
+    embeddings = _FakeEmbeddings(drop_last_once=True)
+    sidecar = EmbeddingSidecar(embeddings, socket_path=socket_path)
+
+    async with _running(sidecar) as client:
+        with pytest.raises(RuntimeError, match="returned 1 vectors for 2 texts"):
+            await asyncio.to_thread(client.embed_documents, ["a", "b"])
+        assert await asyncio.to_thread(client.embed_documents, ["a", "b"]) == [[1.0], [1.0]]
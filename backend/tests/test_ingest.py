@@ -0,0 +1,179 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain.schema import Document
+
+from app import ingest
+from app.ingest import BulkIngester, IngestManifest, document_id_for
+from app.services import vector_store as vector_store_module
+from app.services.vector_store import VectorStoreService
+
+
+class _FakeCollection:
+    def __init__(self, store: "_FakeVectorStore"):
+        self.store = store
+
+    def delete(self, where: dict) -> None:
+        document_ids = set(where["document_id"]["$in"])
+        self.store.chunks = {
+            chunk_id: doc for chunk_id, doc in self.store.chunks.items()
+            if doc.metadata["document_id"] not in document_ids
+        }
+
+
+class _FakeVectorStore:
+    """In-memory stand-in for the langchain Chroma store."""
+
+    def __init__(self):
+        self.chunks: dict[str, Document] = {}
+        self.write_sizes: list[int] = []
+        self._collection = _FakeCollection(self)
+
+    def add_documents(self, documents: list[Document], ids: list[str]) -> list[str]:
+        if any("POISON" in doc.page_content for doc in documents):
+            raise RuntimeError("embedding request rejected")
+        self.write_sizes.append(len(documents))
+        self.chunks.update(zip(ids, documents))
+        return ids
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = _FakeVectorStore()
+    monkeypatch.setattr(vector_store_module, "get_vector_store", lambda workspace_id=None: fake)
+    return fake
+
+
+@pytest.fixture
+def in_process_parsing(monkeypatch):
+    """Parse in threads, one chunk per line, so tests don't spawn processes."""
+
+    def parse(file_path: str) -> list[Document]:
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        if "UNPARSEABLE" in text:
+            raise ValueError("corrupt file")
+        return [Document(page_content=line) for line in text.splitlines()]
+
+    monkeypatch.setattr(ingest, "_parse_file", parse)
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+def _chunks(*contents: str) -> list[Document]:
+    return [Document(page_content=content) for content in contents]
+
+
+def _ingest(root, manifest_path, batch_size=4) -> BulkIngester:
+    manifest = IngestManifest(manifest_path)
+    try:
+        ingester = BulkIngester(root, manifest, workers=2, batch_size=batch_size)
+        ingester.run()
+    finally:
+        manifest.close()
+    return ingester
+
+
+def test_manifest_skips_torn_last_line(tmp_path):
+    manifest_path = tmp_path / "manifest.jsonl"
+    manifest_path.write_text(
+        '{"path": "a.txt", "status": "processed", "size": 1, "mtime": 1.0}\n'
+        '{"path": "b.txt", "stat'
+    )
+
+    manifest = IngestManifest(manifest_path)
+    manifest.close()
+
+    assert list(manifest.entries) == ["a.txt"]
+
+
+def test_is_done_requires_same_size_and_mtime(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("one")
+    manifest = IngestManifest(tmp_path / "manifest.jsonl")
+    stat = path.stat()
+    manifest.record([{
+        "path": "a.txt",
+        "status": "processed",
+        "size": stat.st_size,
+        "mtime": stat.st_mtime
+    }])
+
+    assert manifest.is_done("a.txt", path.stat())
+
+    path.write_text("one two")
+    assert not manifest.is_done("a.txt", path.stat())
+
+    path.write_text("one")
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert not manifest.is_done("a.txt", path.stat())
+    manifest.close()
+
+
+def test_rerun_skips_finished_files_and_retries_failed_ones(tmp_path, store, in_process_parsing):
+    root = tmp_path / "archive"
+    root.mkdir()
+    (root / "good.txt").write_text("alpha\nbeta")
+    (root / "broken.txt").write_text("UNPARSEABLE")
+    manifest_path = tmp_path / "manifest.jsonl"
+
+    first = _ingest(root, manifest_path)
+    assert (first.files_done, first.files_failed) == (1, 1)
+
+    (root / "broken.txt").write_text("fixed")
+    second = _ingest(root, manifest_path)
+
+    assert (second.files_done, second.files_failed, second.files_skipped) == (1, 0, 1)
+    assert sorted(doc.page_content for doc in store.chunks.values()) == [
+        "alpha", "beta", "fixed"
+    ]
+
+
+def test_failed_batch_write_is_retried_per_file(tmp_path, store, in_process_parsing):
+    root = tmp_path / "archive"
+    root.mkdir()
+    (root / "a.txt").write_text("one\ntwo")
+    (root / "b.txt").write_text("POISON")
+    (root / "c.txt").write_text("three")
+    manifest_path = tmp_path / "manifest.jsonl"
+
+    ingester = _ingest(root, manifest_path, batch_size=100)
+
+    assert (ingester.files_done, ingester.files_failed) == (2, 1)
+    manifest = IngestManifest(manifest_path)
+    manifest.close()
+    assert manifest.entries["b.txt"]["status"] == "failed"
+    assert manifest.entries["a.txt"]["status"] == "processed"
+
+
+def test_large_document_is_written_in_batch_size_slices(store):
+    service = VectorStoreService()
+
+    ids = service.add_documents_bulk(
+        {"doc_big": _chunks(*[f"chunk {i}" for i in range(10)])},
+        batch_size=4
+    )
+
+    assert len(ids) == 10
+    assert store.write_sizes == [4, 4, 2]
+
+
+def test_add_documents_bulk_removes_stale_trailing_chunks(store):
+    service = VectorStoreService()
+    service.add_documents_bulk({
+        "doc_a": _chunks("a0", "a1", "a2"),
+        "doc_b": _chunks("b0")
+    })
+
+    service.add_documents_bulk({"doc_a": _chunks("a0 v2")})
+
+    assert sorted(store.chunks) == ["doc_a_0", "doc_b_0"]
+    assert store.chunks["doc_a_0"].page_content == "a0 v2"
+
+
+def test_document_id_depends_on_root_and_keeps_full_digest(tmp_path):
+    first = document_id_for(tmp_path / "one", "notes.txt")
+    second = document_id_for(tmp_path / "two", "notes.txt")
+
+    assert first != second
+    assert len(first) == len("doc_") + 40
@@ -0,0 +1,128 @@
+import pytest
+from langchain.callbacks.base import AsyncCallbackHandler
+from langchain.schema import HumanMessage
+
+from app.services import rag_service
+from app.services.llm_hedging import HedgedChatModel
+from app.services.rag_service import RAGService
+from tests.stubs import StubChatModel, StubProviderError
+
+MESSAGES = [HumanMessage(content="What is in the archive?")]
+
+
+class _TokenRecorder(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    async def on_llm_new_token(self, token: str, **kwargs) -> None:
+        self.tokens.append(token)
+
+
+@pytest.mark.asyncio
+async def test_primary_wins_without_hedging():
+    primary = StubChatModel(label="primary")
+    secondary = StubChatModel(label="secondary")
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.2)
+
+    result = await llm.ainvoke(MESSAGES)
+
+    assert result.content == "primary " * 3
+    assert primary.calls == 1
+    assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_primary_stream_is_cancelled():
+    primary = StubChatModel(label="primary", first_token_delay=5)
+    secondary = StubChatModel(label="secondary")
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.05)
+
+    result = await llm.ainvoke(MESSAGES)
+
+    assert result.content == "secondary " * 3
+    assert secondary.calls == 1
+    assert primary.cancelled
+
+
+@pytest.mark.asyncio
+async def test_primary_failure_before_hedge_fails_over():
+    primary = StubChatModel(label="primary", fail_before_first_token=True)
+    secondary = StubChatModel(label="secondary")
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=5)
+
+    result = await llm.ainvoke(MESSAGES)
+
+    assert result.content == "secondary " * 3
+    assert primary.calls == 1
+    assert secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_failure_restarts_on_other_provider():
+    primary = StubChatModel(label="primary", fail_after_tokens=1)
+    secondary = StubChatModel(label="secondary")
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.2)
+
+    result = await llm.ainvoke(MESSAGES)
+
+    # The partial primary answer is discarded, not spliced into the fallback
+    assert result.content == "secondary " * 3
+    assert secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_both_providers_failing_propagates_error():
+    primary = StubChatModel(label="primary", fail_before_first_token=True)
+    secondary = StubChatModel(label="secondary", fail_before_first_token=True)
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.2)
+
+    with pytest.raises(StubProviderError, match="secondary failed"):
+        await llm.ainvoke(MESSAGES)
+
+    assert primary.calls == 1
+    assert secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_kwargs_and_streamed_tokens_are_forwarded():
+    primary = StubChatModel(label="primary", seen_kwargs=[])
+    secondary = StubChatModel(label="secondary", seen_kwargs=[])
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.2)
+    recorder = _TokenRecorder()
+
+    await llm.ainvoke(MESSAGES, config={"callbacks": [recorder]}, temperature=0.3)
+
+    assert primary.seen_kwargs == [{"temperature": 0.3}]
+    assert recorder.tokens == ["primary "] * 3
+
+
+@pytest.mark.asyncio
+async def test_mid_stream_failover_reports_only_the_fallback_tokens():
+    primary = StubChatModel(label="primary", fail_after_tokens=2)
+    secondary = StubChatModel(label="secondary")
+    llm = HedgedChatModel(primary=primary, secondary=secondary, hedge_delay=0.2)
+    recorder = _TokenRecorder()
+
+    await llm.ainvoke(MESSAGES, config={"callbacks": [recorder]})
+
+    assert recorder.tokens == ["secondary "] * 3
+
+
+def test_fallback_model_is_required_for_a_different_provider(monkeypatch):
+    monkeypatch.setattr(rag_service.settings, "llm_provider", "anthropic")
+    monkeypatch.setattr(rag_service.settings, "llm_fallback_provider", "openai")
+    monkeypatch.setattr(rag_service.settings, "llm_fallback_model", "")
+
+    with pytest.raises(ValueError, match="LLM_FALLBACK_MODEL"):
+        RAGService.__new__(RAGService)._initialize_llm()
+
+
+def test_fallback_model_defaults_to_primary_model_for_the_same_provider(monkeypatch):
+    monkeypatch.setattr(rag_service.settings, "llm_provider", "anthropic")
+    monkeypatch.setattr(rag_service.settings, "llm_fallback_provider", "anthropic")
+    monkeypatch.setattr(rag_service.settings, "llm_fallback_model", "")
+    monkeypatch.setattr(rag_service.settings, "anthropic_api_key", "test-key")
+
+    llm = RAGService.__new__(RAGService)._initialize_llm()
+
+    assert llm.secondary.model == rag_service.settings.llm_model
@@ -0,0 +1,96 @@
+import pytest
+from langchain.schema import Document
+
+from app.services import reranker as reranker_module
+from app.services.reranker import Reranker
+
+
+class _FakeCrossEncoder:
+    """Scores a pair by the chunk length, recording every predict call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(list(pairs))
+        return [float(len(content)) for _, content in pairs]
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    encoder = _FakeCrossEncoder()
+    monkeypatch.setattr(reranker_module, "get_cross_encoder", lambda: encoder)
+    return encoder
+
+
+def _candidates(*contents: str) -> list[tuple[Document, float]]:
+    # Equal first-stage distances, so the order is never clear
+    return [(Document(page_content=content), 0.5) for content in contents]
+
+
+def test_reranks_by_cross_encoder_score(cross_encoder):
+    reranker = Reranker(batch_size=8, skip_gap=1.0, cache_size=100)
+
+    docs = reranker.rerank("query", _candidates("a", "ccc", "bb"), top_n=2)
+
+    assert [doc.page_content for doc in docs] == ["ccc", "bb"]
+    assert len(cross_encoder.calls) == 1
+
+
+def test_cached_scores_are_not_recomputed(cross_encoder):
+    reranker = Reranker(batch_size=8, skip_gap=1.0, cache_size=100)
+
+    reranker.rerank("query", _candidates("a", "bb", "ccc"), top_n=1)
+    reranker.rerank("query", _candidates("a", "bb", "ccc", "dddd"), top_n=1)
+
+    assert cross_encoder.calls[1] == [("query", "dddd")]
+
+
+def test_least_recently_used_scores_are_evicted(cross_encoder):
+    reranker = Reranker(batch_size=8, skip_gap=1.0, cache_size=2)
+
+    reranker.rerank("query", _candidates("a", "bb"), top_n=1)
+    # Touch "a" so "bb" is the least recently used entry
+    reranker.rerank("query", _candidates("a", "ccc"), top_n=1)
+    reranker.rerank("query", _candidates("a", "bb"), top_n=1)
+
+    assert cross_encoder.calls[1] == [("query", "ccc")]
+    assert cross_encoder.calls[2] == [("query", "bb")]
+    assert len(reranker._cache) == 2
+
+
+def test_clear_first_stage_gap_skips_reranking(cross_encoder):
+    reranker = Reranker(batch_size=8, skip_gap=0.2, cache_size=100)
+    candidates = [
+        (Document(page_content="a"), 0.1),
+        (Document(page_content="bb"), 0.15),
+        (Document(page_content="ccc"), 0.6)
+    ]
+
+    docs = reranker.rerank("query", candidates, top_n=2)
+
+    assert [doc.page_content for doc in docs] == ["a", "bb"]
+    assert cross_encoder.calls == []
+
+
+def test_rerank_many_scores_shared_pairs_once(cross_encoder):
+    reranker = Reranker(batch_size=8, skip_gap=1.0, cache_size=100)
+    shared = _candidates("a", "bb", "ccc")
+
+    results = reranker.rerank_many(
+        ["same", "same", "other"],
+        [shared, shared, _candidates("bb", "dddd")],
+        top_n=1
+    )
+
+    assert [[doc.page_content for doc in docs] for docs in results] == [
+        ["ccc"], ["ccc"], ["dddd"]
+    ]
+    assert len(cross_encoder.calls) == 1
+    assert sorted(cross_encoder.calls[0]) == [
+        ("other", "bb"),
+        ("other", "dddd"),
+        ("same", "a"),
+        ("same", "bb"),
+        ("same", "ccc")
+    ]
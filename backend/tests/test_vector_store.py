@@ -0,0 +1,103 @@
+import pytest
+
+from app.services import vector_store as vector_store_module
+from app.services.vector_store import ShardNotFoundError, batch_search_with_score
+
+
+class _FakeCollection:
+    """Answers a multi-embedding query from fixed (text, distance) hits per query."""
+
+    def __init__(self, hits_per_query: list[list[tuple[str, float]]]):
+        self.hits_per_query = hits_per_query
+        self.queries = []
+
+    def query(self, query_embeddings, n_results, where, include):
+        self.queries.append({"embeddings": query_embeddings, "n_results": n_results, "where": where})
+        hits = [sorted(hits, key=lambda hit: hit[1])[:n_results] for hits in self.hits_per_query]
+        return {
+            "documents": [[text for text, _ in query_hits] for query_hits in hits],
+            "metadatas": [[{"source": text} for text, _ in query_hits] for query_hits in hits],
+            "distances": [[distance for _, distance in query_hits] for query_hits in hits]
+        }
+
+
+class _FakeStore:
+    def __init__(self, collection: _FakeCollection):
+        self._collection = collection
+
+
+class _FakeClient:
+    def __init__(self, collection_names: set[str]):
+        self.collection_names = collection_names
+
+    def get_collection(self, name: str):
+        if name not in self.collection_names:
+            raise ValueError(f"Collection {name} does not exist.")
+        return object()
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    collections = {
+        None: _FakeCollection([[("shared", 0.5)], [("shared", 0.5)]]),
+        "a": _FakeCollection([
+            [("a1", 0.1), ("a2", 0.4), ("a3", 0.9)],
+            [("a1", 0.8)]
+        ]),
+        "b": _FakeCollection([
+            [("b1", 0.2), ("b2", 0.3)],
+            [("b1", 0.05), ("b2", 0.7)]
+        ])
+    }
+    collection_names = {
+        vector_store_module.get_shard_collection_name(workspace_id)
+        for workspace_id in collections if workspace_id
+    }
+    monkeypatch.setattr(vector_store_module, "_known_shards", set())
+    monkeypatch.setattr(vector_store_module, "get_chroma_client", lambda: _FakeClient(collection_names))
+    monkeypatch.setattr(
+        vector_store_module,
+        "get_vector_store",
+        lambda workspace_id=None: _FakeStore(collections[workspace_id])
+    )
+    return collections
+
+
+def _texts(results):
+    return [[(doc.page_content, distance) for doc, distance in hits] for hits in results]
+
+
+def test_merges_top_k_per_query_across_shards(shards):
+    results = batch_search_with_score([[0.0], [1.0]], ["a", "b"], k=3)
+
+    assert _texts(results) == [
+        [("a1", 0.1), ("b1", 0.2), ("b2", 0.3)],
+        [("b1", 0.05), ("b2", 0.7), ("a1", 0.8)]
+    ]
+    assert results[0][0][0].metadata == {"source": "a1"}
+
+
+def test_queries_each_shard_once_with_every_embedding(shards):
+    batch_search_with_score([[0.0], [1.0]], ["a", "b", "a"], k=2, filter_dict={"document_id": "x"})
+
+    for workspace_id in ("a", "b"):
+        assert shards[workspace_id].queries == [{
+            "embeddings": [[0.0], [1.0]],
+            "n_results": 2,
+            "where": {"document_id": "x"}
+        }]
+
+
+def test_without_workspaces_searches_the_shared_collection(shards):
+    results = batch_search_with_score([[0.0], [1.0]], None, k=4)
+
+    assert _texts(results) == [[("shared", 0.5)], [("shared", 0.5)]]
+    assert shards["a"].queries == []
+
+
+def test_unknown_shard_is_reported_before_searching(shards):
+    with pytest.raises(ShardNotFoundError) as exc_info:
+        batch_search_with_score([[0.0]], ["a", "missing"], k=2)
+
+    assert exc_info.value.workspace_ids == ["missing"]
+    assert shards["a"].queries == []
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.services.workspaces import get_shard_collection_name, validate_workspace_id
+
+
+@pytest.mark.parametrize("workspace_id", ["a", "team_a", "Team-42", "x" * 40])
+def test_accepts_valid_workspace_ids(workspace_id):
+    assert validate_workspace_id(workspace_id) == workspace_id
+
+
+@pytest.mark.parametrize(
+    "workspace_id",
+    ["", "team_a\n", "_team", "team-", "team a", "team/a", "x" * 41]
+)
+def test_rejects_invalid_workspace_ids(workspace_id):
+    with pytest.raises(ValueError):
+        validate_workspace_id(workspace_id)
+
+
+def test_rejects_ids_that_overflow_the_collection_name(monkeypatch):
+    from app.services import workspaces
+
+    monkeypatch.setattr(workspaces.settings, "collection_name", "c" * 30)
+
+    assert len(get_shard_collection_name("x" * 32)) == 63
+    with pytest.raises(ValueError, match="too long"):
+        validate_workspace_id("x" * 33)
+
+
+def test_request_models_do_not_import_the_vector_store():
+    code = (
+        "import sys, app.api.models.requests; "
+        "sys.exit('app.services.vector_store' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0